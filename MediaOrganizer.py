@@ -15,18 +15,78 @@ Date: 2024
 """
 
 import os
+import errno
+import json
+import logging
 import shutil
+import sqlite3
 import subprocess
+import tempfile
+import multiprocessing
+import multiprocessing.util
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import sys
 
+# Optional: Pillow (und pillow-heif für HEIC) zum direkten Lesen der EXIF-Daten ohne exiftool,
+# tqdm für eine Fortschrittsanzeige
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+    heif_supported = True
+except ImportError:
+    heif_supported = False
+
 # Liste der gängigen Video- und Bildformate
 video_extensions = ('.mov', '.mp4', '.avi', '.mkv', '.flv', '.wmv', '.m4v')
 image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.heic')
+media_extensions = frozenset(video_extensions + image_extensions)
 
 # Mögliche Metadatenfelder für das Erstellungsdatum
 date_fields = ['CreateDate', 'DateTimeOriginal', 'MediaCreateDate', 'TrackCreateDate']
 
+# Bildformate, deren EXIF-Daten mit Pillow gelesen werden können, und die zugehörigen EXIF-Tags
+native_extensions = frozenset(('.jpg', '.jpeg', '.png') + (('.heic',) if heif_supported else ())) if Image else frozenset()
+native_date_tags = [('CreateDate', 0x9004), ('DateTimeOriginal', 0x9003)]
+exif_ifd_pointer = 0x8769
+
+# -fast spart nur das Suchen nach Anhängen am Dateiende (z. B. JPEG-Trailer). -fast2 wäre hier falsch: es bricht
+# bei QuickTime-Dateien am mdat-Atom und bei PNG am IDAT-Chunk ab, viele MP4/MOV/HEIC-Dateien haben ihr moov-
+# bzw. Metadaten-Atom aber erst dahinter
+# -charset filename=utf8 sorgt dafür, dass exiftool die UTF-8-kodierten Pfade aus der Argumentdatei
+# auch unter Windows korrekt auflöst
+exiftool_args = ['-charset', 'filename=utf8', '-j', '-fast'] + [f'-{field}' for field in date_fields]
+
+# Persistenter Cache der Erstellungsdaten, damit wiederholte Läufe exiftool nur für neue/geänderte Dateien starten
+cache_path = os.path.join(os.path.expanduser('~'), '.cache', 'MediaOrganizer', 'exif.db')
+
+# Name des Logfiles, das im Quellverzeichnis angelegt wird
+run_log_name = 'MediaOrganizer_run.log'
+
+# Anzahl der Worker-Prozesse, die jeweils einen eigenen exiftool-Prozess betreiben
+worker_count = os.cpu_count() or 1
+
+# Höchstzahl an Dateien je Auftrag an einen Worker; kleinere Aufträge begrenzen den Speicherbedarf und
+# der Hauptprozess kann bereits umbenennen und verschieben, während die Worker weiterlesen
+batch_size = 500
+
+# Anzahl gleichzeitiger Verschiebe-Operationen; auf Netzlaufwerken überlappen sich so die Latenzen
+move_workers = 32
+
+# exiftool-Prozess des aktuellen Worker-Prozesses (wird beim ersten Aufruf gestartet)
+_worker_et = None
+
 def print_help():
     """
     Zeigt die Hilfeoptionen an, wenn -help als Parameter übergeben wird.
@@ -37,9 +97,10 @@ def print_help():
     python script.py <Quellverzeichnis> [Optionen]
 
     Optionen:
-    -move <Zielverzeichnis>  : Benennt Dateien im Quellverzeichnis um und verschiebt sie anschließend in die entsprechende Jahres-/Monatsstruktur im Zielverzeichnis.
+    -move <Zielverzeichnis>  : Benennt Dateien um und verschiebt sie dabei direkt in die entsprechende Jahres-/Monatsstruktur im Zielverzeichnis.
     -rename                  : Benennt nur die Dateien im Quellverzeichnis um, ohne sie zu verschieben.
     -r                       : Verarbeitet die Dateien im Quellverzeichnis rekursiv (durchläuft auch Unterverzeichnisse).
+    -v, --verbose            : Gibt jede verarbeitete Datei auf der Konsole aus (standardmäßig nur Fortschritt, Warnungen und Fehler).
     -help                    : Zeigt diese Hilfsnachricht an.
 
     Beispiele:
@@ -51,112 +112,559 @@ def print_help():
     """
     print(help_text)
 
-def log_info(message, log_file_path):
-    """ Schreibe Informationen ins Logfile. """
-    with open(log_file_path, 'a') as log_file:
-        log_file.write(message + "\n")
+def open_run_log(logger, folder):
+    """ 
+    Öffne ein gemeinsames Logfile für den gesamten Lauf im Quellverzeichnis und hänge es an den Logger an.
+    Ein bestehendes Logfile wird dabei überschrieben; jede Zeile beginnt mit dem bearbeiteten Verzeichnis.
+    """
+    handler = logging.FileHandler(os.path.join(folder, run_log_name), mode='w')
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(logging.Formatter('[%(directory)s] %(message)s'))
+    logger.addHandler(handler)
+    return handler
+
+def is_media_file(file_name):
+    """ Prüfe anhand der Dateiendung, ob es sich um eine Bild- oder Videodatei handelt. """
+    return os.path.splitext(file_name)[1].lower() in media_extensions
 
-def get_creation_date(file_path):
-    """ Versuche, das Erstellungsdatum einer Datei (Bild oder Video) zu extrahieren. """
-    try:
-        result = subprocess.run(['exiftool', '-j'] + [f'-{field}' for field in date_fields] + [file_path],
-                                capture_output=True, text=True)
-        metadata = result.stdout
-        
-        for field in date_fields:
-            if f'"{field}"' in metadata:
-                date_str = metadata.split(f'"{field}": "')[1].split('"')[0]
-                creation_date = datetime.strptime(date_str, '%Y:%m:%d %H:%M:%S')
+def _parse_exif_ts(date_str):
+    """ 
+    Wandle einen exiftool-Zeitstempel im festen Format 'YYYY:MM:DD HH:MM:SS' in ein datetime um.
+    Die Felder werden direkt ausgeschnitten, das ist deutlich schneller als datetime.strptime.
+    """
+    return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]),
+                    int(date_str[11:13]), int(date_str[14:16]), int(date_str[17:19]))
+
+def _format_exif_ts(creation_date):
+    """ Gegenstück zu _parse_exif_ts; ohne strftime, dessen %Y je nach Plattform kleine Jahre nicht auffüllt. """
+    return (f"{creation_date.year:04d}:{creation_date.month:02d}:{creation_date.day:02d} "
+            f"{creation_date.hour:02d}:{creation_date.minute:02d}:{creation_date.second:02d}")
+
+def parse_creation_date(metadata):
+    """ Ermittle das Erstellungsdatum aus dem Metadaten-Eintrag einer Datei. """
+    for field in date_fields:
+        if field in metadata:
+            try:
+                creation_date = _parse_exif_ts(metadata[field])
                 return creation_date, field
-        return None, None
-    except Exception as e:
-        print(f"Fehler beim Abrufen des Erstellungsdatums für {file_path}: {e}")
-        return None, None
-
-def rename_file_based_on_date(file_path, log_file_path):
-    """ Benenne die Datei basierend auf ihrem Erstellungsdatum um. """
-    creation_date, field_used = get_creation_date(file_path)
-    if creation_date:
-        formatted_date = creation_date.strftime('%Y-%m-%d_%H-%M-%S')
-        file_dir, file_extension = os.path.splitext(file_path)
-        new_name = f"{formatted_date}{file_extension}"
-        new_file_path = os.path.join(os.path.dirname(file_path), new_name)
-        
+            except (TypeError, ValueError):
+                continue
+    return None, None
+
+class ExifToolDaemon:
+    """ 
+    Hält einen exiftool-Prozess im -stay_open-Modus offen, damit Perl nur einmal pro Programmlauf gestartet wird.
+    Die Argumente werden zeilenweise über stdin übergeben, die Ausgabe endet jeweils mit "{ready}".
+    """
+    ready_marker = '{ready}'
+
+    def __init__(self, executable='exiftool'):
+        self.executable = executable
+        self.process = None
+
+    def start(self):
+        """ Starte den exiftool-Prozess. """
+        self.process = subprocess.Popen([self.executable, '-stay_open', 'True', '-@', '-'],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                        text=True, encoding='utf-8')
+
+    def execute_lines(self, args):
+        """ 
+        Führe einen exiftool-Befehl aus und liefere dessen Ausgabe Zeile für Zeile, ohne sie vollständig zu puffern.
+        Wird die Ausgabe nicht bis zum Ende gelesen, wird der Rest verworfen, damit der nächste Befehl sauber startet.
+        """
+        self.process.stdin.write('\n'.join(args) + '\n-execute\n')
+        self.process.stdin.flush()
+        finished = False
         try:
-            shutil.move(file_path, new_file_path)
-            print(f"Datei umbenannt: {file_path} -> {new_file_path}")
-            log_info(f"Datei umbenannt: {file_path} -> {new_file_path} (basierend auf {field_used})", log_file_path)
-            return new_file_path  # Rückgabe des neuen Dateipfads
-        except Exception as e:
-            print(f"Fehler beim Umbenennen der Datei: {e}")
-            log_info(f"Fehler beim Umbenennen der Datei {file_path}: {e}", log_file_path)
-    else:
-        print(f"Kein Erstellungsdatum gefunden für {file_path}. Datei bleibt unverändert.")
-        log_info(f"Kein Erstellungsdatum gefunden: {file_path} bleibt unverändert.", log_file_path)
-    return None  # Wenn kein Datum gefunden wurde
-
-def move_file_based_on_date(file_path, target_base_folder, log_file_path):
-    """ Verschiebe die Datei basierend auf ihrem Erstellungsdatum in die Zielverzeichnisstruktur. """
-    creation_date, _ = get_creation_date(file_path)
-    if creation_date:
-        year = creation_date.strftime('%Y')
-        year_month = creation_date.strftime('%Y-%m')
-        
-        target_folder = os.path.join(target_base_folder, year, year_month)
-        os.makedirs(target_folder, exist_ok=True)
-        
-        file_name = os.path.basename(file_path)
-        target_file_path = os.path.join(target_folder, file_name)
-        
-        # Prüfe, ob die Datei bereits im Zielverzeichnis existiert
-        if os.path.exists(target_file_path):
-            log_info(f"Datei existiert bereits: {target_file_path}. Datei wurde nicht verschoben.", log_file_path)
-            print(f"Datei existiert bereits: {target_file_path}. Datei wurde nicht verschoben.")
+            for line in self.process.stdout:
+                if line.strip() == self.ready_marker:
+                    finished = True
+                    return
+                yield line
+            raise RuntimeError('exiftool wurde unerwartet beendet')
+        finally:
+            if not finished:
+                for line in self.process.stdout:
+                    if line.strip() == self.ready_marker:
+                        break
+
+    def close(self):
+        """ Beende den exiftool-Prozess. """
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.write('-stay_open\nFalse\n')
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+        self.process = None
+
+class MetadataCache:
+    """ 
+    Speichert die ermittelten Erstellungsdaten in einer SQLite-Datenbank, Schlüssel sind Pfad, Größe und
+    Änderungszeit der Datei. Ändert sich eine Datei, passt der Eintrag nicht mehr und sie wird neu gelesen.
+    Schlägt ein Zugriff fehl (z. B. weil ein zweiter Lauf die Datenbank sperrt), wird eine Warnung
+    protokolliert und der Rest des Laufs ohne Cache fortgesetzt.
+    """
+
+    def __init__(self, db_path, logger):
+        self.db_path = db_path
+        self.logger = logger
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS exif (path TEXT, size INT, mtime INT, date TEXT, field TEXT, '
+                                'PRIMARY KEY (path, size, mtime))')
+
+    def _disable(self, error):
+        """ Verwirf die Verbindung nach einem Datenbankfehler; alle weiteren Aufrufe laufen ins Leere. """
+        self.logger.warning(f"Warnung: Cache {self.db_path} nicht nutzbar, fahre ohne Cache fort: {error}")
+        try:
+            self.connection.close()
+        except sqlite3.Error:
+            pass
+        self.connection = None
+
+    def lookup(self, file_path, file_stat):
+        """ Gib (Erstellungsdatum, Feld) aus dem Cache zurück oder None, wenn die Datei unbekannt ist. """
+        if self.connection is None:
+            return None
+        try:
+            row = self.connection.execute('SELECT date, field FROM exif WHERE path = ? AND size = ? AND mtime = ?',
+                                          (os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns)).fetchone()
+        except sqlite3.Error as e:
+            self._disable(e)
+            return None
+        if row is None:
+            return None
+        date_str, field = row
+        if not date_str:
+            return None, None
+        try:
+            return _parse_exif_ts(date_str), field
+        except (TypeError, ValueError):
+            # Unlesbarer Eintrag (z. B. aus einer älteren Version): wie eine unbekannte Datei behandeln
+            return None
+
+    def store(self, file_path, file_stat, creation_date, field):
+        """ Lege das Ergebnis für eine Datei im Cache ab; auch fehlende Daten werden gemerkt. """
+        if self.connection is None:
+            return
+        date_str = _format_exif_ts(creation_date) if creation_date else None
+        try:
+            self.connection.execute('INSERT OR REPLACE INTO exif VALUES (?, ?, ?, ?, ?)',
+                                    (os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns, date_str, field))
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def forget(self, file_path):
+        """ Entferne alle Einträge eines Pfads, z. B. nachdem die Datei verschoben wurde. """
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute('DELETE FROM exif WHERE path = ?', (os.path.abspath(file_path),))
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def commit(self):
+        """ Schreibe alle Änderungen in einer Transaktion. """
+        if self.connection is None:
             return
-        
         try:
-            shutil.move(file_path, target_file_path)
-            print(f"Datei verschoben: {file_path} -> {target_file_path}")
-            log_info(f"Datei verschoben: {file_path} -> {target_file_path}", log_file_path)
+            self.connection.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def close(self):
+        """ Schließe die Datenbank. """
+        self.commit()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+def open_metadata_cache(db_path, logger):
+    """ Öffne den Cache; ist das nicht möglich, läuft das Skript ohne Cache weiter. """
+    try:
+        return MetadataCache(db_path, logger)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Warnung: Cache {db_path} konnte nicht geöffnet werden, fahre ohne Cache fort: {e}")
+        return None
+
+def iter_json_objects(lines):
+    """ 
+    Dekodiere die JSON-Ausgabe von exiftool ([{...},{...}]) schrittweise und liefere die Objekte einzeln,
+    sobald sie vollständig gelesen wurden.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    for line in lines:
+        buffer += line
+        while True:
+            buffer = buffer.lstrip(' \t\r\n[],')
+            if not buffer:
+                break
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break  # Objekt noch unvollständig, weitere Zeilen abwarten
+            yield obj
+            buffer = buffer[end:]
+
+def argfile_paths(file_paths):
+    """ 
+    Bereite Pfade für die Argumentdatei von exiftool vor. Da die Pfade nicht über die Kommandozeile laufen,
+    gilt kein ARG_MAX-Limit. exiftool liest Zeilen mit führendem '-' als Option, überspringt Zeilen mit
+    führendem '#' und entfernt führende Leerzeichen; relative Pfade erhalten deshalb immer das Präfix './'.
+    Pfade mit Zeilenumbruch lassen sich zeilenweise nicht übergeben und werden ausgelassen.
+    """
+    return [file_path if os.path.isabs(file_path) else os.path.join('.', file_path)
+            for file_path in file_paths if '\n' not in file_path]
+
+def get_creation_dates_batch(file_paths, et, creation_dates=None):
+    """ 
+    Extrahiere die Erstellungsdaten mehrerer Dateien mit einem einzigen exiftool-Befehl.
+    Jede Antwort wird sofort in das Dictionary {Dateipfad: (Erstellungsdatum, Feld)} eingetragen, das am Ende
+    zurückgegeben wird; bricht exiftool ab, bleiben die bis dahin gelesenen Ergebnisse darin erhalten.
+    Fehler der Kommunikation mit exiftool werden weitergereicht.
+    """
+    if creation_dates is None:
+        creation_dates = {}
+    if not file_paths:
+        return creation_dates
+
+    # exiftool gibt die Pfade ggf. mit anderen Trennzeichen zurück
+    paths_by_key = {os.path.normpath(file_path): file_path for file_path in file_paths}
+    for metadata in iter_json_objects(et.execute_lines(exiftool_args + argfile_paths(file_paths))):
+        file_path = paths_by_key.get(os.path.normpath(metadata.get('SourceFile', '')))
+        if file_path is not None:
+            creation_dates[file_path] = parse_creation_date(metadata)
+    return creation_dates
+
+def get_creation_date_native(file_path):
+    """ 
+    Lies das Erstellungsdatum mit Pillow direkt aus dem EXIF-Block, ohne exiftool zu bemühen.
+    Gibt (None, None) zurück, wenn kein verwertbares Datum gefunden wurde.
+    """
+    try:
+        with Image.open(file_path) as image:
+            # Ohne bereits gelesenen EXIF-Block würde getexif() (z. B. bei PNG) das ganze Bild dekodieren
+            if 'exif' not in image.info:
+                return None, None
+            exif = image.getexif().get_ifd(exif_ifd_pointer)
+        for field, tag in native_date_tags:
+            if tag in exif:
+                try:
+                    return _parse_exif_ts(exif[tag]), field
+                except (TypeError, ValueError):
+                    continue
+    except Exception:
+        pass
+    return None, None
+
+def chunk_list(items, chunk_count):
+    """ Teile eine Liste in höchstens chunk_count etwa gleich große Teillisten auf. """
+    chunk_size = max(1, -(-len(items) // chunk_count))
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+def _worker_exiftool():
+    """ Gib den exiftool-Prozess dieses Workers zurück und starte ihn beim ersten Aufruf oder nach einem Absturz neu. """
+    global _worker_et
+    if _worker_et is not None and _worker_et.process.poll() is not None:
+        _discard_worker_exiftool()
+    if _worker_et is None:
+        _worker_et = ExifToolDaemon()
+        _worker_et.start()
+        # exiftool beim Beenden des Worker-Prozesses ordnungsgemäß schließen
+        multiprocessing.util.Finalize(_worker_et, _worker_et.close, exitpriority=10)
+    return _worker_et
+
+def _discard_worker_exiftool():
+    """ Schließe den exiftool-Prozess dieses Workers, dessen Zustand nach einem Fehler unklar ist. """
+    global _worker_et
+    if _worker_et is not None:
+        try:
+            _worker_et.close()
+        except Exception:
+            pass
+        _worker_et = None
+
+def _read_creation_dates(file_paths):
+    """ 
+    Worker-Funktion: Ermittle die Erstellungsdaten zunächst direkt mit Pillow und nur für die
+    übrigen Dateien mit dem exiftool-Prozess dieses Workers. Gibt die Ergebnisse, die Liste der Dateien,
+    die nicht gelesen werden konnten, sowie die Fehlermeldungen zurück, die der Hauptprozess protokolliert.
+    """
+    creation_dates = {}
+    errors = []
+    remaining_files = []
+    for file_path in file_paths:
+        if os.path.splitext(file_path)[1].lower() in native_extensions:
+            creation_date, field_used = get_creation_date_native(file_path)
+            if creation_date:
+                creation_dates[file_path] = (creation_date, field_used)
+                continue
+        remaining_files.append(file_path)
+
+    # Pfade mit Zeilenumbruch lassen sich nicht über die Argumentdatei übergeben
+    pending_files = [file_path for file_path in remaining_files if '\n' not in file_path]
+    failed_attempts = 0
+    while pending_files:
+        answered_count = len(creation_dates)
+        try:
+            get_creation_dates_batch(pending_files, _worker_exiftool(), creation_dates)
+            break
         except Exception as e:
-            print(f"Fehler beim Verschieben der Datei: {e}")
-            log_info(f"Fehler beim Verschieben der Datei {file_path}: {e}", log_file_path)
+            errors.append(str(e))
+            _discard_worker_exiftool()
+        # exiftool arbeitet die Dateien der Reihe nach ab, die erste unbeantwortete Datei hat den Abbruch
+        # ausgelöst; sie wird übersprungen und nur der Rest mit einem neuen Prozess erneut gelesen.
+        # Bleiben zwei Versuche hintereinander ohne jede Antwort, ist exiftool selbst defekt.
+        failed_attempts = failed_attempts + 1 if len(creation_dates) == answered_count else 1
+        if failed_attempts >= 2:
+            break
+        pending_files = [file_path for file_path in pending_files if file_path not in creation_dates][1:]
+    unread_files = [file_path for file_path in remaining_files if file_path not in creation_dates]
+    return creation_dates, unread_files, errors
+
+def is_case_sensitive(folder):
+    """ 
+    Prüfe mit einer temporären Datei, ob das Dateisystem des Ordners Groß- und Kleinschreibung unterscheidet
+    (z. B. ext4/btrfs auf dem NAS) oder nicht (z. B. NTFS, SMB-Freigaben, APFS).
+    """
+    try:
+        with tempfile.NamedTemporaryFile(prefix='mediaorganizer_', dir=folder) as probe:
+            probe_dir, probe_name = os.path.split(probe.name)
+            return not os.path.exists(os.path.join(probe_dir, probe_name.upper()))
+    except OSError:
+        return True
+
+def _fast_move(src, dst, same_device=True):
+    """ 
+    Verschiebe eine Datei mit einem einzigen os.rename-Aufruf.
+    Liegen Quelle und Ziel auf unterschiedlichen Dateisystemen, wird auf shutil.move ausgewichen.
+    """
+    if same_device:
+        try:
+            os.rename(src, dst)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    shutil.move(src, dst)
+
+def get_date_file_name(file_path, creation_date):
+    """ Ermittle den neuen Dateinamen (YYYY-MM-DD_HH-MM-SS.ext) anhand des Erstellungsdatums. """
+    formatted_date = (f"{creation_date.year:04d}-{creation_date.month:02d}-{creation_date.day:02d}_"
+                      f"{creation_date.hour:02d}-{creation_date.minute:02d}-{creation_date.second:02d}")
+    file_dir, file_extension = os.path.splitext(file_path)
+    return f"{formatted_date}{file_extension}"
+
+def get_target_folder(target_base_folder, creation_date):
+    """ Ermittle den Jahres-/Monatsordner für ein Erstellungsdatum. """
+    year = f"{creation_date.year:04d}"
+    year_month = f"{year}-{creation_date.month:02d}"
+    return os.path.join(target_base_folder, year, year_month)
+
+def place_file(file_path, target_file_path, field_used, same_device, logger):
+    """ 
+    Benenne die Datei mit einem einzigen Aufruf um und verschiebe sie dabei gegebenenfalls direkt an ihren
+    endgültigen Platz in der Jahres-/Monatsstruktur. Verschiebungen werden parallel in einem Thread-Pool ausgeführt.
+    Gibt True zurück, wenn die Datei nun unter target_file_path liegt.
+    """
+    renamed_in_place = os.path.dirname(file_path) == os.path.dirname(target_file_path)
+    try:
+        _fast_move(file_path, target_file_path, same_device)
+        if renamed_in_place:
+            logger.info(f"Datei umbenannt: {file_path} -> {target_file_path} (basierend auf {field_used})")
+        else:
+            logger.info(f"Datei verschoben: {file_path} -> {target_file_path} (basierend auf {field_used})")
+        return True
+    except Exception as e:
+        if renamed_in_place:
+            logger.error(f"Fehler beim Umbenennen der Datei {file_path}: {e}")
+        else:
+            logger.error(f"Fehler beim Verschieben der Datei {file_path}: {e}")
+        return False
+
+def _cache_placement(cache, file_path, target_file_path, file_stat, creation_date, field_used, placed):
+    """ 
+    Merke das Erstellungsdatum unter dem Pfad, unter dem die Datei nach dem Umbenennen/Verschieben tatsächlich
+    liegt. Beides ändert Größe und Änderungszeit nicht, der Eintrag des alten Pfads wird entfernt.
+    """
+    if placed:
+        cache.forget(file_path)
+        cache.store(target_file_path, file_stat, creation_date, field_used)
     else:
-        print(f"Kein Erstellungsdatum gefunden für {file_path}. Datei wird nicht verschoben.")
-        log_info(f"Kein Erstellungsdatum gefunden: {file_path}. Datei wird nicht verschoben.", log_file_path)
+        cache.store(file_path, file_stat, creation_date, field_used)
+
+class _NoProgress:
+    """ Ersatz für die tqdm-Fortschrittsanzeige, wenn tqdm fehlt oder die Ausgabe ausführlich ist. """
 
-def process_media_in_folder(folder, recursive, target_folder=None, rename_only=False):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def update(self, count):
+        pass
+
+class _TqdmConsoleHandler(logging.StreamHandler):
+    """ Konsolen-Handler, der über tqdm.write schreibt, damit Meldungen die Fortschrittsanzeige nicht zerreißen. """
+
+    def emit(self, record):
+        try:
+            tqdm.write(self.format(record), file=self.stream)
+            self.flush()
+        except Exception:
+            self.handleError(record)
+
+def _progress_bar(total, description, show):
+    """ Erzeuge eine Fortschrittsanzeige für die Dateien eines Verzeichnisses. """
+    if tqdm is None or not show or not total:
+        return _NoProgress()
+    return tqdm(total=total, desc=description, unit=' Dateien', leave=False)
+
+def process_media_files(directory, media_files, pool, target_base_folder, rename_only, same_device, dest_listings, fold_case, cache, logger):
+    """ 
+    Ermittle die Erstellungsdaten aller Dateien eines Verzeichnisses aus dem Cache bzw. parallel in den
+    Worker-Prozessen und verarbeite jedes Teilergebnis, sobald es vorliegt. Die Entscheidung über Zielpfade
+    fällt nur im Hauptprozess. Bei fold_case werden Dateinamen im Zielordner ohne Beachtung der
+    Groß-/Kleinschreibung verglichen, passend zu einem Dateisystem, das sie nicht unterscheidet.
+    """
+    move_files = target_base_folder and not rename_only
+    logger = logging.LoggerAdapter(logger, {'directory': directory})  # Verzeichnis als Präfix jeder Logzeile
+    logger.debug(f"Verarbeite Verzeichnis: {directory}")
+
+    # Bereits bekannte, unveränderte Dateien aus dem Cache nehmen, nur der Rest geht an exiftool
+    file_stats = {}
+    cached_dates = {}
+    uncached_files = media_files
+    if cache:
+        uncached_files = []
+        for file_path in media_files:
+            try:
+                file_stats[file_path] = os.stat(file_path)
+            except OSError:
+                uncached_files.append(file_path)
+                continue
+            cached = cache.lookup(file_path, file_stats[file_path])
+            if cached is None:
+                uncached_files.append(file_path)
+            else:
+                cached_dates[file_path] = cached
+    chunk_count = max(worker_count, -(-len(uncached_files) // batch_size))
+    results = chain([(cached_dates, [], [])], pool.imap_unordered(_read_creation_dates, chunk_list(uncached_files, chunk_count)))
+
+    # Fortschrittsanzeige statt einer Ausgabe je Datei; bei -v stattdessen die ausführlichen Meldungen
+    progress = _progress_bar(len(media_files), directory, show=not logger.isEnabledFor(logging.DEBUG))
+
+    # Beim Verlassen wartet der Thread-Pool auf alle Verschiebungen des Verzeichnisses
+    moves = []
+    with progress, ThreadPoolExecutor(max_workers=move_workers) as mover:
+        for creation_dates, unread_files, errors in results:
+            for error in errors:
+                logger.error(f"Fehler beim Abrufen der Erstellungsdaten: {error}")
+            # Nicht gelesene Dateien bleiben unverändert und werden nicht gecacht, damit sie beim nächsten Lauf erneut gelesen werden
+            for file_path in unread_files:
+                progress.update(1)
+                logger.warning(f"Metadaten konnten nicht gelesen werden: {file_path} bleibt unverändert.")
+            for file_path, (creation_date, field_used) in creation_dates.items():
+                progress.update(1)
+                logger.debug(f"Verarbeite Datei: {file_path}")
+                file_stat = file_stats.get(file_path)
+                if not creation_date:
+                    logger.info(f"Kein Erstellungsdatum gefunden: {file_path} bleibt unverändert.")
+                    if file_stat and file_path not in cached_dates:
+                        cache.store(file_path, file_stat, creation_date, field_used)
+                    continue
+
+                file_name = get_date_file_name(file_path, creation_date)
+                if not move_files:
+                    target_file_path = os.path.join(directory, file_name)
+                    placed = place_file(file_path, target_file_path, field_used, True, logger)
+                    if file_stat:
+                        _cache_placement(cache, file_path, target_file_path, file_stat, creation_date, field_used, placed)
+                else:
+                    # Zielordner nur beim ersten Auftreten anlegen und seinen Inhalt einmalig einlesen,
+                    # statt für jede Datei einzeln zu prüfen
+                    target_folder = get_target_folder(target_base_folder, creation_date)
+                    if target_folder not in dest_listings:
+                        os.makedirs(target_folder, exist_ok=True)
+                        dest_listings[target_folder] = {name.lower() if fold_case else name for name in os.listdir(target_folder)}
+                    target_file_path = os.path.join(target_folder, file_name)
+                    name_key = file_name.lower() if fold_case else file_name
+
+                    # Prüfe, ob die Datei bereits im Zielverzeichnis existiert oder gerade dorthin verschoben wird
+                    if name_key in dest_listings[target_folder]:
+                        logger.info(f"Datei existiert bereits: {target_file_path}. {file_path} wurde nicht verschoben.")
+                        if file_stat and file_path not in cached_dates:
+                            cache.store(file_path, file_stat, creation_date, field_used)
+                        continue
+                    dest_listings[target_folder].add(name_key)
+                    move = mover.submit(place_file, file_path, target_file_path, field_used, same_device, logger)
+                    if file_stat:
+                        moves.append((move, file_path, target_file_path, file_stat, creation_date, field_used))
+            # Je Teilergebnis festschreiben, damit die Schreibsperre nicht ein ganzes Verzeichnis lang gehalten wird
+            if cache:
+                cache.commit()
+
+    # Erst nach Abschluss der Verschiebungen festhalten, wo die Dateien tatsächlich liegen
+    for move, file_path, target_file_path, file_stat, creation_date, field_used in moves:
+        _cache_placement(cache, file_path, target_file_path, file_stat, creation_date, field_used, move.result())
+    if cache:
+        cache.commit()
+    return len(media_files)
+
+def _media_files(entries, subdirectories=None):
+    """ 
+    Liefere in einem Durchlauf die Pfade aller Mediendateien der Verzeichniseinträge. Die Dateiendung wird
+    zuerst geprüft, damit andere Dateien nur eine Prüfung kosten. Ist subdirectories angegeben, werden
+    die Unterverzeichnisse dort gesammelt.
+    """
+    for entry in entries:
+        if is_media_file(entry.name) and entry.is_file():
+            yield entry.path
+        elif subdirectories is not None and entry.is_dir(follow_symlinks=False):
+            subdirectories.append(entry.path)
+
+def scan_media_directories(folder, recursive, logger):
+    """ 
+    Durchlaufe den Ordner (bei recursive auch alle Unterverzeichnisse) mit os.scandir und liefere
+    je Verzeichnis ein Tupel (Verzeichnis, Liste der Mediendateien). Der Dateityp stammt direkt
+    aus dem Verzeichniseintrag, ein zusätzlicher stat-Aufruf je Datei entfällt.
+    """
+    pending = [folder]
+    while pending:
+        directory = pending.pop()
+        subdirectories = []
+        try:
+            with os.scandir(directory) as entries:
+                media_files = list(_media_files(entries, subdirectories if recursive else None))
+        except OSError as e:
+            logger.error(f"Fehler beim Lesen des Verzeichnisses {directory}: {e}", extra={'directory': directory})
+            continue
+        yield directory, media_files
+        if recursive:
+            # Umgekehrt auf den Stapel legen, damit die Unterverzeichnisse in Listenreihenfolge folgen
+            pending.extend(reversed(subdirectories))
+
+def process_media_in_folder(folder, recursive, pool, logger, target_folder=None, rename_only=False, cache=None):
     """ 
     Durchlaufe den angegebenen Ordner und benenne Bild- und Videodateien um oder verschiebe sie je nach Parametern.
+    Gibt die Anzahl der verarbeiteten Mediendateien zurück.
     """
-    if recursive:
-        for root, dirs, files in os.walk(folder):
-            print(f"Verarbeite Verzeichnis: {root}")
-            log_file_path = os.path.join(root, "RenameScript_log.txt")
-            if os.path.exists(log_file_path):
-                os.remove(log_file_path)
-
-            for file in files:
-                file_path = os.path.join(root, file)
-                if file.lower().endswith(video_extensions) or file.lower().endswith(image_extensions):
-                    print(f"Verarbeite Datei: {file_path}")
-                    new_file_path = rename_file_based_on_date(file_path, log_file_path)
-                    if new_file_path and not rename_only and target_folder:
-                        move_file_based_on_date(new_file_path, target_folder, log_file_path)  # Verschiebe die Datei mit dem neuen Namen
-    else:
-        print(f"Verarbeite Verzeichnis: {folder}")
-        log_file_path = os.path.join(folder, "RenameScript_log.txt")
-        if os.path.exists(log_file_path):
-            os.remove(log_file_path)
-
-        for file in os.listdir(folder):
-            file_path = os.path.join(folder, file)
-            if os.path.isfile(file_path):
-                if file.lower().endswith(video_extensions) or file.lower().endswith(image_extensions):
-                    print(f"Verarbeite Datei: {file_path}")
-                    new_file_path = rename_file_based_on_date(file_path, log_file_path)
-                    if new_file_path and not rename_only and target_folder:
-                        move_file_based_on_date(new_file_path, target_folder, log_file_path)  # Verschiebe die Datei mit dem neuen Namen
+    # Einmalig prüfen, ob Quell- und Zielverzeichnis auf demselben Dateisystem liegen
+    same_device = not target_folder or os.stat(folder).st_dev == os.stat(target_folder).st_dev
+    dest_listings = {}  # Zielordner -> Dateinamen darin
+    # Namen im Zielordner so vergleichen, wie das Dateisystem es tut (wie zuvor os.path.exists)
+    fold_case = bool(target_folder) and not rename_only and not is_case_sensitive(target_folder)
+
+    processed_count = 0
+    for directory, media_files in scan_media_directories(folder, recursive, logger):
+        processed_count += process_media_files(directory, media_files, pool, target_folder, rename_only, same_device, dest_listings, fold_case, cache, logger)
+    return processed_count
 
 if __name__ == "__main__":
     # Wenn -help als Parameter übergeben wird, Hilfe anzeigen
@@ -187,6 +695,8 @@ if __name__ == "__main__":
     if '-r' in sys.argv:
         recursive = True
 
+    verbose = '-v' in sys.argv or '--verbose' in sys.argv
+
     # Fehlerüberprüfung für Ordner
     if not os.path.isdir(source_folder):
         print(f"Fehler: {source_folder} ist kein gültiges Quellverzeichnis.")
@@ -201,5 +711,30 @@ if __name__ == "__main__":
         print("Fehler: Die Optionen '-move' und '-rename' dürfen nicht gleichzeitig verwendet werden.")
         sys.exit(1)
 
-    # Medienverarbeitung starten
-    process_media_in_folder(source_folder, recursive, target_folder, rename_only)
+    if shutil.which('exiftool') is None:
+        print("Fehler: exiftool wurde nicht gefunden. Bitte sicherstellen, dass exiftool im Systempfad verfügbar ist.")
+        sys.exit(1)
+
+    # Logger einmalig mit einem gemeinsamen Logfile für den gesamten Lauf einrichten; auf der Konsole
+    # erscheinen standardmäßig nur Warnungen und Fehler, mit -v alle Meldungen
+    logger = logging.getLogger('media')
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    logger.propagate = False
+    console = _TqdmConsoleHandler(sys.stdout) if tqdm else logging.StreamHandler(sys.stdout)
+    console.setLevel(logging.DEBUG if verbose else logging.WARNING)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(console)
+    run_log = open_run_log(logger, source_folder)
+    cache = open_metadata_cache(cache_path, logging.LoggerAdapter(logger, {'directory': source_folder}))
+
+    # Medienverarbeitung starten, die exiftool-Prozesse der Worker bleiben für den gesamten Lauf geöffnet
+    try:
+        with multiprocessing.Pool(processes=worker_count) as pool:
+            processed_count = process_media_in_folder(source_folder, recursive, pool, logger, target_folder, rename_only, cache)
+            pool.close()
+            pool.join()
+    finally:
+        if cache:
+            cache.close()
+        run_log.close()
+    print(f"{processed_count} Mediendateien verarbeitet. Details siehe {os.path.join(source_folder, run_log_name)}")